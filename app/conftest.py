@@ -0,0 +1,13 @@
+"""Shared pytest configuration for the project."""
+import pytest
+
+from django.test import override_settings
+
+
+@pytest.fixture(scope='session', autouse=True)
+def fast_password_hasher():
+    """Hash test passwords with MD5 instead of the deliberately slow KDF."""
+    with override_settings(PASSWORD_HASHERS=[
+        'django.contrib.auth.hashers.MD5PasswordHasher',
+    ]):
+        yield
@@ -5,7 +5,12 @@ import uuid
 import os
 
 from django.conf import settings
-from django.db import models
+from django.contrib.postgres.fields import ArrayField
+from django.db import connections, models
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import JSONObject
+from seal.models import SealableManager, SealableModel
+from seal.query import SealableQuerySet
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
@@ -57,7 +62,47 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = 'email'
 
 
-class Recipe(models.Model):
+class ArraySubquery(Subquery):
+    """Subquery whose rows are returned as a single Postgres array.
+
+    Unlike a plain subquery, the queryset's ordering is kept, as it sets
+    the order of the array elements.
+    """
+    template = 'ARRAY(%(subquery)s)'
+
+    def resolve_expression(self, *args, **kwargs):
+        # Query.resolve_expression() drops the ordering of unsliced
+        # subqueries.
+        ordering = self.query.order_by
+        clone = super().resolve_expression(*args, **kwargs)
+        clone.query.order_by = ordering
+        return clone
+
+
+class RecipeQuerySet(SealableQuerySet):
+    """QuerySet for recipes."""
+
+    def with_nested(self, *fields):
+        """Annotate M2M fields as ``<field>_json`` lists of id/name objects.
+
+        Each relation is aggregated in a subquery, so recipes and their
+        nested objects load in a single query.
+        """
+        annotations = {}
+        for field in fields:
+            related_model = self.model._meta.get_field(field).related_model
+            rows = related_model.objects.filter(
+                recipe=OuterRef('pk'),
+            ).order_by('id').values(json=JSONObject(id='id', name='name'))
+            annotations[f'{field}_json'] = ArraySubquery(
+                rows,
+                output_field=ArrayField(models.JSONField()),
+            )
+
+        return self.annotate(**annotations)
+
+
+class Recipe(SealableModel):
     """Recipe object.
 
     Each recipe is associated with a user, and has a title,
@@ -76,11 +121,47 @@ class Recipe(models.Model):
     ingredients = models.ManyToManyField('Ingredient')
     image = models.ImageField(null=True, upload_to=recipe_image_file_path)
 
+    objects = RecipeQuerySet.as_manager()
+
     def __str__(self):
         return self.title
 
 
-class Tag(models.Model):
+class RecipeAttrManager(SealableManager):
+    """Manager for user owned recipe attributes."""
+
+    def get_or_create_many(self, user, names):
+        """Return ids of the user's objects with the given names.
+
+        Missing objects are inserted by the same statement, so resolving
+        any number of names is a single round trip.
+        """
+        names = list(set(names))
+        if not names:
+            return []
+
+        connection = connections[self.db]
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        sql = f"""
+            WITH existing AS (
+                SELECT id, name FROM {table}
+                WHERE user_id = %s AND name = ANY(%s)
+            ), created AS (
+                INSERT INTO {table} (user_id, name)
+                SELECT %s, new.name FROM unnest(%s::varchar[]) AS new(name)
+                WHERE new.name NOT IN (SELECT name FROM existing)
+                RETURNING id
+            )
+            SELECT id FROM existing
+            UNION ALL
+            SELECT id FROM created
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [user.pk, names, user.pk, names])
+            return [row[0] for row in cursor.fetchall()]
+
+
+class Tag(SealableModel):
     """Tag for filtering recipes."""
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -88,11 +169,13 @@ class Tag(models.Model):
     )
     name = models.CharField(max_length=255)
 
+    objects = RecipeAttrManager()
+
     def __str__(self):
         return self.name
 
 
-class Ingredient(models.Model):
+class Ingredient(SealableModel):
     """Ingredient for recipes."""
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -100,5 +183,7 @@ class Ingredient(models.Model):
     )
     name = models.CharField(max_length=255)
 
+    objects = RecipeAttrManager()
+
     def __str__(self):
         return self.name
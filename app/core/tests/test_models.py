@@ -97,6 +97,47 @@ class ModelTests(TestCase):
 
         self.assertEqual(str(ingredient), ingredient.name)
 
+    def test_get_or_create_many(self):
+        """Test resolving names reuses existing rows and creates others."""
+        user = create_user()
+        other_user = create_user(email='other@example.com')
+        tag = models.Tag.objects.create(user=user, name='Tag1')
+        models.Tag.objects.create(user=other_user, name='Tag2')
+
+        with self.assertNumQueries(1):
+            ids = models.Tag.objects.get_or_create_many(
+                user, ['Tag1', 'Tag2', 'Tag2'])
+
+        tags = models.Tag.objects.filter(id__in=ids)
+        self.assertEqual(len(ids), 2)
+        self.assertIn(tag.id, ids)  # type: ignore
+        self.assertEqual(
+            sorted(tags.values_list('name', flat=True)), ['Tag1', 'Tag2'])
+        self.assertTrue(all(t.user == user for t in tags))
+        self.assertEqual(models.Tag.objects.count(), 3)
+
+    def test_with_nested_orders_by_id(self):
+        """Test nested objects are annotated in id order."""
+        user = create_user()
+        recipe = models.Recipe.objects.create(
+            user=user,
+            title='Sample recipe name',
+            time_minutes=5,
+            price=Decimal('5.50'),
+        )
+        tags = [
+            models.Tag.objects.create(user=user, name=f'Tag{i}')
+            for i in range(3)
+        ]
+        recipe.tags.add(*reversed(tags))
+
+        queryset = models.Recipe.objects.with_nested('tags')
+        self.assertIn('ORDER BY', str(queryset.query))
+        self.assertEqual(
+            queryset.get().tags_json,
+            [{'id': tag.id, 'name': tag.name} for tag in tags],
+        )
+
     @patch('core.models.uuid.uuid4')
     def test_recipe_file_name_uuid(self, mock_uuid):
         """Test that image is saved in the correct location."""
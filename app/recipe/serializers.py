@@ -1,5 +1,11 @@
 """Serializers for the recipe app."""
+from collections import OrderedDict
+import copy
+
+from django.db import models, transaction
+
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
 
 from core.models import (
     Recipe,
@@ -8,25 +14,128 @@ from core.models import (
     )
 
 
-class TagSerializer(serializers.ModelSerializer):
+def get_requested_fields(request):
+    """Return field names requested with ``?fields=``, or None for all.
+
+    Only read requests are narrowed, so writes always validate every field.
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+
+    fields = request.query_params.get('fields')
+    if not fields:
+        return None
+
+    return {name.strip() for name in fields.split(',') if name.strip()}
+
+
+class ValuesListSerializer(serializers.ListSerializer):
+    """List serializer rendering querysets without model field machinery.
+
+    Meant for flat serializers whose fields map directly onto model
+    attributes. Rows annotated by ``RecipeQuerySet.with_nested()`` are used
+    as is and querysets that are not loaded yet are fetched with
+    ``values()``. Related managers are read off their (usually prefetched)
+    objects, so sealed instances still flag lazy loads.
+    """
+
+    def get_attribute(self, instance):
+        nested = getattr(instance, f'{self.field_name}_json', None)
+        if nested is not None:
+            return nested
+
+        return super().get_attribute(instance)
+
+    def to_representation(self, data):
+        names = [
+            name for name, field in self.child.fields.items()
+            if not field.write_only
+        ]
+        if isinstance(data, models.QuerySet) and data._result_cache is None:
+            return list(data.values(*names))
+        if isinstance(data, models.Manager):
+            # values() would clone, and so unseal, the related queryset.
+            data = data.all()
+        if isinstance(data, models.QuerySet):
+            return [{name: getattr(obj, name) for name in names}
+                    for obj in data]
+        if isinstance(data, list) and all(
+                isinstance(item, dict) for item in data):
+            return [{name: item[name] for name in names} for item in data]
+
+        return super().to_representation(data)
+
+
+class FieldsCacheMixin:
+    """Build a serializer class's fields once and copy them per instance.
+
+    ``ModelSerializer.get_fields()`` introspects the model on every call.
+    Deep copies keep the binding state of each instance separate.
+    """
+
+    _fields_cache = {}
+
+    def get_fields(self):
+        cache = FieldsCacheMixin._fields_cache
+        cls = type(self)
+        if cls not in cache:
+            cache[cls] = super().get_fields()
+
+        return copy.deepcopy(cache[cls])
+
+
+class SparseFieldsMixin:
+    """Limit serialized fields to those requested with ``?fields=``."""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        requested = get_requested_fields(self.context.get('request'))
+        if requested is None:
+            return fields
+
+        return OrderedDict(
+            (name, field) for name, field in fields.items()
+            if name in requested
+        )
+
+
+class BaseRecipeAttrSerializer(serializers.Serializer):
+    """Base serializer for user owned recipe attributes."""
+
+    id = serializers.IntegerField(read_only=True)
+    name = serializers.CharField(max_length=255)
+
+    def create(self, validated_data):
+        """Create and return a new recipe attribute."""
+        return self.Meta.model.objects.create(  # type: ignore
+            **validated_data)
+
+    def update(self, instance, validated_data):
+        """Update and return an existing recipe attribute."""
+        instance.name = validated_data.get('name', instance.name)
+        instance.save()
+        return instance
+
+
+class TagSerializer(BaseRecipeAttrSerializer):
     """Serializer for tag objects."""
 
     class Meta:
         model = Tag
-        fields = ('id', 'name')
-        read_only_fields = ('id',)
+        list_serializer_class = ValuesListSerializer
 
 
-class IngredientSerializer(serializers.ModelSerializer):
+class IngredientSerializer(BaseRecipeAttrSerializer):
     """Serializer for ingredient objects."""
 
     class Meta:
         model = Ingredient
-        fields = ('id', 'name')
-        read_only_fields = ('id',)
+        list_serializer_class = ValuesListSerializer
 
 
-class RecipeSerializer(serializers.ModelSerializer):
+class RecipeSerializer(SparseFieldsMixin,
+                       FieldsCacheMixin,
+                       serializers.ModelSerializer):
     """Serializer for recipe objects."""
 
     tags = TagSerializer(many=True, required=False)
@@ -44,38 +153,61 @@ class RecipeSerializer(serializers.ModelSerializer):
             'ingredients',
         )
         read_only_fields = ('id',)
+        # Related fields the view loads with RecipeQuerySet.with_nested().
+        nested_fields = ('tags', 'ingredients')
 
-    def _get_or_create_tags(self, tags_data, recipe):
-        """Handle getting or creating tags as needed."""
-        auth_user = self.context['request'].user  # type: ignore
+    def _get_or_create_by_name(self, model, items_data, auth_user):
+        """Return ids matching items_data, creating missing objects."""
+        # A set also drops names repeated within the payload.
+        names = {item_data['name'] for item_data in items_data}
+        return model.objects.get_or_create_many(auth_user, names)
 
-        for tag_data in tags_data:
-            tag, _ = Tag.objects.get_or_create(
-                user=auth_user,
-                **tag_data
-            )
-            recipe.tags.add(tag)
+    def _get_or_create_tags(self, tags_data, auth_user):
+        """Handle getting or creating tags as needed."""
+        return self._get_or_create_by_name(Tag, tags_data, auth_user)
 
-    def _get_or_create_ingredients(self, ingredients_data, recipe):
+    def _get_or_create_ingredients(self, ingredients_data, auth_user):
         """Handle getting or creating ingredients as needed."""
-        auth_user = self.context['request'].user  # type: ignore
+        return self._get_or_create_by_name(
+            Ingredient, ingredients_data, auth_user)
+
+    def _sync_related(self, manager, ids):
+        """Add and remove only the objects that differ from the manager.
 
-        for ingredient_data in ingredients_data:
-            ingredient, _ = Ingredient.objects.get_or_create(
-                user=auth_user,
-                **ingredient_data
-            )
-            recipe.ingredients.add(ingredient)
+        Nothing is written when the relation already matches, so clearing
+        an empty relation issues no DELETE.
+        """
+        current_ids = set(manager.values_list('id', flat=True))
+        new_ids = set(ids)
+
+        if new_ids - current_ids:
+            manager.add(*(new_ids - current_ids))
+        if current_ids - new_ids:
+            manager.remove(*(current_ids - new_ids))
 
     def create(self, validated_data):
         """Create and return a new recipe."""
         tags_data = validated_data.pop('tags', [])  # type: ignore
         ingredients_data = validated_data.pop(
             'ingredients', [])  # type: ignore
-        recipe = Recipe.objects.create(**validated_data)
+        auth_user = self.context['request'].user  # type: ignore
+
+        with transaction.atomic():
+            recipe = Recipe.objects.create(**validated_data)
+            tag_ids = self._get_or_create_tags(tags_data, auth_user)
+            ingredient_ids = self._get_or_create_ingredients(
+                ingredients_data, auth_user)
 
-        self._get_or_create_tags(tags_data, recipe)
-        self._get_or_create_ingredients(ingredients_data, recipe)
+            # The recipe is new, so link rows can be inserted directly.
+            Recipe.tags.through.objects.bulk_create([
+                Recipe.tags.through(recipe_id=recipe.pk, tag_id=tag_id)
+                for tag_id in tag_ids
+            ])
+            Recipe.ingredients.through.objects.bulk_create([
+                Recipe.ingredients.through(
+                    recipe_id=recipe.pk, ingredient_id=ingredient_id)
+                for ingredient_id in ingredient_ids
+            ])
 
         return recipe
 
@@ -84,19 +216,29 @@ class RecipeSerializer(serializers.ModelSerializer):
         tags_data = validated_data.pop('tags', None)  # type: ignore
         ingredients_data = validated_data.pop(
             'ingredients', None)  # type: ignore
+        auth_user = self.context['request'].user  # type: ignore
 
-        if tags_data is not None:
-            instance.tags.clear()
-            self._get_or_create_tags(tags_data, instance)
+        with transaction.atomic():
+            if tags_data is not None:
+                self._sync_related(
+                    instance.tags,
+                    self._get_or_create_tags(tags_data, auth_user),
+                )
 
-        if ingredients_data is not None:
-            instance.ingredients.clear()
-            self._get_or_create_ingredients(ingredients_data, instance)
+            if ingredients_data is not None:
+                self._sync_related(
+                    instance.ingredients,
+                    self._get_or_create_ingredients(
+                        ingredients_data, auth_user),
+                )
 
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
+            if validated_data:
+                # Only write the submitted columns, not the whole row.
+                # save() keeps field pre_save hooks, e.g. storing images.
+                for attr, value in validated_data.items():
+                    setattr(instance, attr, value)
+                instance.save(update_fields=list(validated_data))
 
-        instance.save()
         return instance
 
 
@@ -0,0 +1,6 @@
+import warnings
+
+from seal.exceptions import UnsealedAttributeAccess
+
+# Fail tests on lazy relation access from sealed querysets (N+1 queries).
+warnings.filterwarnings('error', category=UnsealedAttributeAccess)
@@ -3,7 +3,7 @@ from decimal import Decimal
 
 from django.contrib.auth import get_user_model
 from django.urls import reverse
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase
 
 from rest_framework import status
 from rest_framework.test import APIClient
@@ -28,7 +28,25 @@ def create_user(email: str = 'test@example.com',
         password=password)  # type: ignore
 
 
-class PublicIngredientsApiTests(TestCase):
+def create_ingredients(user, names):
+    """Helper function to create ingredients in a single query."""
+    return Ingredient.objects.bulk_create(
+        [Ingredient(user=user, name=name) for name in names])
+
+
+def create_recipes(user, count):
+    """Helper function to create sample recipes in a single query."""
+    return Recipe.objects.bulk_create([
+        Recipe(
+            user=user,
+            title=f'Recipe{i}',
+            time_minutes=10,
+            price=Decimal('5.00'),
+        ) for i in range(1, count + 1)
+    ])
+
+
+class PublicIngredientsApiTests(SimpleTestCase):
     """Tests for unauthenticated ingredients API access."""
 
     def setUp(self):
@@ -43,15 +61,17 @@ class PublicIngredientsApiTests(TestCase):
 class PrivateIngredientsApiTests(TestCase):
     """Tests for authenticated ingredients API access."""
 
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user()
+
     def setUp(self):
-        self.user = create_user()
         self.client = APIClient()
         self.client.force_authenticate(user=self.user)
 
     def test_retrieve_ingredients(self):
         """Test retrieving a list of ingredients."""
-        Ingredient.objects.create(user=self.user, name='Ingredient1')
-        Ingredient.objects.create(user=self.user, name='Ingredient2')
+        create_ingredients(self.user, ['Ingredient1', 'Ingredient2'])
 
         res = self.client.get(INGREDIENTS_URL)
         ingredients = Ingredient.objects.all().order_by('-name')
@@ -99,22 +119,9 @@ class PrivateIngredientsApiTests(TestCase):
 
     def test_filter_ingredients_assigned_to_recipes(self):
         """Test listing ingredients to those assigned to recipes."""
-        ingredient1 = Ingredient.objects.create(
-            user=self.user, name='Ingredient1')
-        ingredient2 = Ingredient.objects.create(
-            user=self.user, name='Ingredient2')
-        recipe1 = Recipe.objects.create(
-            title='Recipe1',
-            time_minutes=10,
-            price=Decimal('5.00'),
-            user=self.user
-        )
-        recipe2 = Recipe.objects.create(
-            title='Recipe2',
-            time_minutes=20,
-            price=Decimal('10.00'),
-            user=self.user
-        )
+        ingredient1, ingredient2 = create_ingredients(
+            self.user, ['Ingredient1', 'Ingredient2'])
+        recipe1, recipe2 = create_recipes(self.user, 2)
         recipe1.ingredients.add(ingredient1)
         recipe2.ingredients.add(ingredient1)
 
@@ -127,21 +134,9 @@ class PrivateIngredientsApiTests(TestCase):
 
     def test_filtered_ingredients_unique(self):
         """Test filtered ingredients returns a unique list."""
-        ingredient = Ingredient.objects.create(user=self.user,
-                                               name='Ingredient1')
-        Ingredient.objects.create(user=self.user, name='Ingredient2')
-        recipe1 = Recipe.objects.create(
-            title='Recipe1',
-            time_minutes=10,
-            price=Decimal('5.00'),
-            user=self.user
-        )
-        recipe2 = Recipe.objects.create(
-            title='Recipe2',
-            time_minutes=20,
-            price=Decimal('10.00'),
-            user=self.user
-        )
+        ingredient, _ = create_ingredients(
+            self.user, ['Ingredient1', 'Ingredient2'])
+        recipe1, recipe2 = create_recipes(self.user, 2)
         recipe1.ingredients.add(ingredient)
         recipe2.ingredients.add(ingredient)
 
@@ -6,7 +6,9 @@ import os
 from PIL import Image
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from rest_framework.test import APIClient
@@ -55,7 +57,7 @@ def create_user(**params):
     return get_user_model().objects.create_user(**params)
 
 
-class PublicRecipeApiTests(TestCase):
+class PublicRecipeApiTests(SimpleTestCase):
     """Tests for unauthenticated recipe API access."""
 
     def setUp(self):
@@ -70,26 +72,87 @@ class PublicRecipeApiTests(TestCase):
 class PrivateRecipeApiTests(TestCase):
     """Tests for authenticated recipe API access."""
 
-    def setUp(self):
-        self.user = create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user(
             email='test@example.com',
             password='testpass123',
         )
+        # Shared, read-only recipes; tests that change recipes create
+        # their own.
+        cls.recipes = Recipe.objects.bulk_create([
+            Recipe(
+                user=cls.user,
+                title=f'Recipe{i}',
+                time_minutes=10,
+                price=Decimal('5.50'),
+            ) for i in range(2)
+        ])
+
+    def setUp(self):
         self.client = APIClient()
         self.client.force_authenticate(user=self.user)
 
     def test_retrieve_recipes(self):
         """Test retrieving a list of recipes."""
-        create_recipe(user=self.user)
-        create_recipe(user=self.user)
-
-        res = self.client.get(RECIPES_URL)
+        with self.assertNumQueries(1):
+            res = self.client.get(RECIPES_URL)
         recipes = Recipe.objects.all().order_by('-id')
         serializer = RecipeSerializer(recipes, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data, serializer.data)  # type: ignore
 
+    def test_retrieve_recipes_with_shared_tags(self):
+        """Test listing recipes that share the same tag."""
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        recipes = [create_recipe(user=self.user) for _ in range(2)]
+        for recipe in recipes:
+            recipe.tags.add(tag)
+
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        expected = [{'id': tag.id, 'name': tag.name}]  # type: ignore
+        tagged_ids = {recipe.id for recipe in recipes}  # type: ignore
+        tagged = [
+            recipe for recipe in res.data  # type: ignore
+            if recipe['id'] in tagged_ids
+        ]
+        self.assertEqual(len(tagged), len(recipes))
+        for recipe in tagged:
+            self.assertEqual(recipe['tags'], expected)
+
+    def test_retrieve_recipes_query_count_constant(self):
+        """Test listing recipes does not query per recipe."""
+        for count in (1, 10):
+            with self.subTest(count=count):
+                for i in range(count):
+                    recipe = create_recipe(user=self.user)
+                    recipe.tags.create(user=self.user, name=f'Tag{i}')
+                    recipe.ingredients.create(
+                        user=self.user, name=f'Ingredient{i}')
+
+                # Tags and ingredients load within the recipe query.
+                with self.assertNumQueries(1):
+                    res = self.client.get(RECIPES_URL)
+                self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_retrieve_recipes_sparse_fields(self):
+        """Test listing recipes with only the requested fields."""
+        recipe = create_recipe(user=self.user)
+        recipe.tags.create(user=self.user, name='Tag1')
+
+        with self.assertNumQueries(1):
+            res = self.client.get(RECIPES_URL, {'fields': 'id,title'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        expected = list(
+            Recipe.objects.filter(user=self.user)
+            .order_by('-id').values('id', 'title')
+        )
+        self.assertEqual(res.data, expected)  # type: ignore
+
     def test_recipe_list_limited_to_user(self):
         """Test list of recipes is limited to authenticated user."""
         other_user = create_user(
@@ -97,15 +160,15 @@ class PrivateRecipeApiTests(TestCase):
             password='testpass123',
         )  # type: ignore
         create_recipe(user=other_user)
-        create_recipe(user=self.user)
 
-        res = self.client.get(RECIPES_URL)
+        with self.assertNumQueries(1):
+            res = self.client.get(RECIPES_URL)
         recipes = Recipe.objects.filter(user=self.user).order_by('-id')
         serializer = RecipeSerializer(recipes, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data, serializer.data)  # type: ignore
-        self.assertEqual(len(res.data), 1)  # type: ignore
+        self.assertEqual(len(res.data), len(self.recipes))  # type: ignore
 
     def test_view_recipe_detail(self):
         """Test viewing a recipe detail."""
@@ -130,7 +193,8 @@ class PrivateRecipeApiTests(TestCase):
         res = self.client.post(RECIPES_URL, payload)
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
 
-        recipe = Recipe.objects.get(id=res.data['id'])  # type: ignore
+        recipe = Recipe.objects.only(*payload).get(
+            id=res.data['id'])  # type: ignore
         for key in payload.keys():
             self.assertEqual(getattr(recipe, key), payload[key])
 
@@ -146,6 +210,35 @@ class PrivateRecipeApiTests(TestCase):
         recipe.refresh_from_db()
         self.assertEqual(recipe.title, payload['title'])
 
+    def test_partial_update_keeps_other_fields(self):
+        """Test patching a recipe leaves unsubmitted fields untouched."""
+        original_link = 'https://example.com/recipe.pdf'
+        recipe = create_recipe(user=self.user, link=original_link)
+
+        payload = {'title': 'New recipe title'}
+        url = detail_url(recipe.id)  # type: ignore
+        res = self.client.patch(url, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['title'], payload['title'])  # type: ignore
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.title, payload['title'])
+        self.assertEqual(recipe.link, original_link)
+        self.assertEqual(recipe.user, self.user)
+
+    def test_update_recipe_skips_nested_load(self):
+        """Test updating a recipe does not load its nested objects."""
+        recipe = create_recipe(user=self.user)
+
+        payload = {'title': 'New recipe title'}
+        url = detail_url(recipe.id)  # type: ignore
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.patch(url, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        for query in ctx.captured_queries:
+            self.assertNotIn('ARRAY(', query['sql'])
+
     def test_full_update_recipe(self):
         """Test updating a recipe with put."""
         recipe = create_recipe(user=self.user)
@@ -178,7 +271,8 @@ class PrivateRecipeApiTests(TestCase):
         res = self.client.patch(url, payload)
 
         self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
-        recipe.refresh_from_db()
+        recipe = Recipe.objects.select_related('user').get(
+            id=recipe.id)  # type: ignore
         self.assertEqual(recipe.user.id, other_user.id)  # type: ignore
 
     def test_delete_recipe(self):
@@ -223,7 +317,8 @@ class PrivateRecipeApiTests(TestCase):
         res = self.client.post(RECIPES_URL, payload, format='json')
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
 
-        recipe = Recipe.objects.get(id=res.data['id'])  # type: ignore
+        recipe = Recipe.objects.only('id').get(
+            id=res.data['id'])  # type: ignore
         tags_in_recipe = recipe.tags.all()
         self.assertEqual(tags_in_recipe.count(), 2)
         for tag in payload['tags']:
@@ -233,6 +328,22 @@ class PrivateRecipeApiTests(TestCase):
         for tag in payload['tags']:
             self.assertTrue(tags_in_db.filter(name=tag['name']).exists())
 
+    def test_create_recipe_with_duplicate_tags(self):
+        """Test repeated tag names in a payload create a single tag."""
+        payload = {
+            'title': 'Sample recipe',
+            'time_minutes': 10,
+            'price': Decimal('5.50'),
+            'tags': [{'name': 'Tag1'}, {'name': 'Tag1'}],
+        }
+        res = self.client.post(RECIPES_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        recipe = Recipe.objects.only('id').get(
+            id=res.data['id'])  # type: ignore
+        self.assertEqual(recipe.tags.count(), 1)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 1)
+
     def test_create_recipe_with_existing_tags(self):
         """Test creating a recipe with existing tags."""
         tag = Tag.objects.create(user=self.user, name='Tag1')
@@ -250,7 +361,8 @@ class PrivateRecipeApiTests(TestCase):
         res = self.client.post(RECIPES_URL, payload, format='json')
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
 
-        recipe = Recipe.objects.get(id=res.data['id'])  # type: ignore
+        recipe = Recipe.objects.only('id').get(
+            id=res.data['id'])  # type: ignore
         tags_in_recipe = recipe.tags.all()
         self.assertEqual(tags_in_recipe.count(), 2)
         self.assertTrue(tags_in_recipe.filter(name=tag.name).exists())
@@ -288,6 +400,45 @@ class PrivateRecipeApiTests(TestCase):
         self.assertIn(tag_lunch, recipe.tags.all())
         self.assertNotIn(tag_breakfast, recipe.tags.all())
 
+    def test_update_recipe_keeps_unchanged_tags(self):
+        """Test updating tags only touches the tags that changed."""
+        tag_breakfast = Tag.objects.create(user=self.user, name='Breakfast')
+        tag_lunch = Tag.objects.create(user=self.user, name='Lunch')
+        recipe = create_recipe(user=self.user)
+        recipe.tags.add(tag_breakfast, tag_lunch)
+        link = Recipe.tags.through.objects.get(
+            recipe=recipe, tag=tag_breakfast)
+
+        payload = {
+            'tags': [{'name': 'Breakfast'}, {'name': 'Dinner'}],
+        }
+        url = detail_url(recipe.id)  # type: ignore
+        res = self.client.patch(url, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            set(recipe.tags.values_list('name', flat=True)),
+            {'Breakfast', 'Dinner'},
+        )
+        self.assertTrue(
+            Recipe.tags.through.objects.filter(id=link.id).exists())
+
+    def test_update_recipe_tags_returns_new_tags(self):
+        """Test the update response reflects the updated tags."""
+        tag = Tag.objects.create(user=self.user, name='Breakfast')
+        recipe = create_recipe(user=self.user)
+        recipe.tags.add(tag)
+
+        payload = {'tags': [{'name': 'Lunch'}]}
+        url = detail_url(recipe.id)  # type: ignore
+        res = self.client.patch(url, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [tag['name'] for tag in res.data['tags']],  # type: ignore
+            ['Lunch'],
+        )
+
     def test_clear_recipe_tags(self):
         """Test clearing a recipe's tags."""
         tag = Tag.objects.create(user=self.user, name='Dessert')
@@ -301,6 +452,21 @@ class PrivateRecipeApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(recipe.tags.count(), 0)
 
+    def test_clear_empty_recipe_tags_skips_delete(self):
+        """Test clearing tags on a recipe without tags deletes nothing."""
+        recipe = create_recipe(user=self.user)
+
+        payload = {'tags': []}
+        url = detail_url(recipe.id)  # type: ignore
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.patch(url, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(any(
+            query['sql'].startswith('DELETE')
+            for query in ctx.captured_queries
+        ))
+
     def test_create_recipe_with_new_ingredients(self):
         """Test creating a recipe with new ingredients."""
         payload = {
@@ -317,7 +483,8 @@ class PrivateRecipeApiTests(TestCase):
         res = self.client.post(RECIPES_URL, payload, format='json')
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
 
-        recipe = Recipe.objects.get(id=res.data['id'])  # type: ignore
+        recipe = Recipe.objects.only('id').get(
+            id=res.data['id'])  # type: ignore
         ingredients_in_recipe = recipe.ingredients.all()
         self.assertEqual(ingredients_in_recipe.count(), 2)
         for ingredient in payload['ingredients']:
@@ -347,7 +514,8 @@ class PrivateRecipeApiTests(TestCase):
         res = self.client.post(RECIPES_URL, payload, format='json')
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
 
-        recipe = Recipe.objects.get(id=res.data['id'])  # type: ignore
+        recipe = Recipe.objects.only('id').get(
+            id=res.data['id'])  # type: ignore
         ingredients_in_recipe = recipe.ingredients.all()
         self.assertEqual(ingredients_in_recipe.count(), 2)
         self.assertTrue(ingredients_in_recipe.filter(
@@ -428,6 +596,25 @@ class PrivateRecipeApiTests(TestCase):
         self.assertIn(serializer2.data, res.data)  # type: ignore
         self.assertNotIn(serializer3.data, res.data)  # type: ignore
 
+    def test_filter_by_tags_without_duplicates(self):
+        """Test a recipe matching several filter tags is listed once."""
+        recipe = create_recipe(user=self.user)
+        tag1 = Tag.objects.create(user=self.user, name='Tag1')
+        tag2 = Tag.objects.create(user=self.user, name='Tag2')
+        recipe.tags.add(tag1, tag2)
+
+        params = {'tags': f'{tag1.id},{tag2.id}'}  # type: ignore
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(RECIPES_URL, params)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [r['id'] for r in res.data], [recipe.id])  # type: ignore
+        self.assertEqual(len(ctx.captured_queries), 1)
+        sql = ctx.captured_queries[0]['sql']
+        self.assertIn('EXISTS', sql)
+        self.assertNotIn('DISTINCT', sql)
+
     def test_filter_by_ingredients(self):
         """Test filtering recipes by ingredients."""
         recipe1 = create_recipe(user=self.user, title='Recipe1')
@@ -487,6 +674,20 @@ class RecipeImageUploadTests(TestCase):
         self.assertIn('image', res.data)  # type: ignore
         self.assertTrue(os.path.exists(self.recipe.image.path))
 
+    def test_upload_image_through_recipe_detail(self):
+        """Test patching an image through the recipe detail endpoint."""
+        url = detail_url(self.recipe.id)  # type: ignore
+        with tempfile.NamedTemporaryFile(suffix='.jpg') as ntf:
+            img = Image.new('RGB', (10, 10))
+            img.save(ntf, format='JPEG')
+            ntf.seek(0)
+            res = self.client.patch(url, {'image': ntf}, format='multipart')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.recipe.refresh_from_db()
+        self.assertTrue(self.recipe.image.name.startswith('uploads/recipe/'))
+        self.assertTrue(os.path.exists(self.recipe.image.path))
+
     def test_upload_image_bad_request(self):
         """Test uploading an invalid image."""
         url = image_upload_url(self.recipe.id)  # type: ignore
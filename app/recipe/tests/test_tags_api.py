@@ -1,9 +1,13 @@
 """Tests for tags API."""
 from decimal import Decimal
+from functools import lru_cache
+from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.urls import reverse
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
 
 from rest_framework import status
 from rest_framework.test import APIClient
@@ -15,6 +19,7 @@ from recipe.serializers import TagSerializer
 TAGS_URL = reverse('recipe:tag-list')
 
 
+@lru_cache(maxsize=None)
 def tag_detail_url(tag_id):
     """Helper function to return tag detail URL."""
     return reverse('recipe:tag-detail', args=[tag_id])
@@ -28,7 +33,32 @@ def create_user(email: str = 'test@example.com',
         password=password)  # type: ignore
 
 
-class PublicTagsApiTests(TestCase):
+def create_tags(user, names):
+    """Helper function to create tags in a single query."""
+    return Tag.objects.bulk_create(
+        [Tag(user=user, name=name) for name in names])
+
+
+def create_recipes(user, count):
+    """Helper function to create sample recipes in a single query."""
+    return Recipe.objects.bulk_create([
+        Recipe(
+            user=user,
+            title=f'Recipe{i}',
+            time_minutes=10,
+            price=Decimal('5.00'),
+        ) for i in range(1, count + 1)
+    ])
+
+
+def assign_tag(tag, recipes):
+    """Helper function to link a tag to recipes in a single query."""
+    Recipe.tags.through.objects.bulk_create([
+        Recipe.tags.through(recipe=recipe, tag=tag) for recipe in recipes
+    ])
+
+
+class PublicTagsApiTests(SimpleTestCase):
     """Tests for unauthenticated tags API access."""
 
     def setUp(self):
@@ -43,8 +73,13 @@ class PublicTagsApiTests(TestCase):
 class PrivateTagsApiTests(TestCase):
     """Tests for authenticated tags API access."""
 
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user()
+        cls.other_user = create_user(email='other@example.com',
+                                     password='testpass456')
+
     def setUp(self):
-        self.user = create_user()
         self.client = APIClient()
         self.client.force_authenticate(user=self.user)
 
@@ -53,17 +88,27 @@ class PrivateTagsApiTests(TestCase):
         Tag.objects.create(user=self.user, name='Tag1')
         Tag.objects.create(user=self.user, name='Tag2')
 
-        res = self.client.get(TAGS_URL)
+        with self.assertNumQueries(1):
+            res = self.client.get(TAGS_URL)
         tags = Tag.objects.all().order_by('-name')
         serializer = TagSerializer(tags, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data, serializer.data)  # type: ignore
 
+    def test_retrieve_tags_skips_model_instances(self):
+        """Test listing tags renders rows without building Tag objects."""
+        Tag.objects.create(user=self.user, name='Tag1')
+
+        with patch.object(Tag, 'from_db') as from_db:
+            res = self.client.get(TAGS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), 1)  # type: ignore
+        from_db.assert_not_called()
+
     def test_tags_limited_to_user(self):
         """Test list of tags is limited to authenticated user."""
-        other_user = create_user(email='other@example.com',
-                                 password='testpass456')
-        Tag.objects.create(user=other_user, name='OtherTag')
+        Tag.objects.create(user=self.other_user, name='OtherTag')
         tag = Tag.objects.create(user=self.user, name='MyTag')
 
         res = self.client.get(TAGS_URL)
@@ -82,6 +127,7 @@ class PrivateTagsApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         tag.refresh_from_db()
         self.assertEqual(tag.name, payload['name'])
+        self.assertEqual(tag.user, self.user)
 
     def test_delete_tag(self):
         """Test deleting a tag."""
@@ -95,24 +141,15 @@ class PrivateTagsApiTests(TestCase):
 
     def test_filter_tags_assigned_to_recipes(self):
         """Test listing tags to those assigned to recipes."""
-        tag1 = Tag.objects.create(user=self.user, name='Tag1')
-        tag2 = Tag.objects.create(user=self.user, name='Tag2')
-        recipe1 = Recipe.objects.create(
-            title='Recipe1',
-            time_minutes=10,
-            price=Decimal('5.00'),
-            user=self.user
-        )
-        recipe2 = Recipe.objects.create(
-            title='Recipe2',
-            time_minutes=20,
-            price=Decimal('10.00'),
-            user=self.user
-        )
-        recipe1.tags.add(tag1)
-        recipe2.tags.add(tag1)
-
-        res = self.client.get(TAGS_URL, {'assigned_only': 1})
+        tag1, tag2 = create_tags(self.user, ['Tag1', 'Tag2'])
+        assign_tag(tag1, create_recipes(self.user, 2))
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(TAGS_URL, {'assigned_only': 1})
+        # A single query, filtering with EXISTS rather than a DISTINCT join.
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertIn('EXISTS', ctx.captured_queries[0]['sql'])
+        self.assertNotIn('DISTINCT', ctx.captured_queries[0]['sql'])
         serializer1 = TagSerializer(tag1)
         serializer2 = TagSerializer(tag2)
         self.assertIn(serializer1.data, res.data)  # type: ignore
@@ -120,22 +157,8 @@ class PrivateTagsApiTests(TestCase):
 
     def test_filtered_tags_unique(self):
         """Test filtered tags returns a unique list."""
-        tag = Tag.objects.create(user=self.user, name='Tag1')
-        Tag.objects.create(user=self.user, name='Tag2')
-        recipe1 = Recipe.objects.create(
-            title='Recipe1',
-            time_minutes=10,
-            price=Decimal('5.00'),
-            user=self.user
-        )
-        recipe2 = Recipe.objects.create(
-            title='Recipe2',
-            time_minutes=20,
-            price=Decimal('10.00'),
-            user=self.user
-        )
-        recipe1.tags.add(tag)
-        recipe2.tags.add(tag)
+        tag, _ = create_tags(self.user, ['Tag1', 'Tag2'])
+        assign_tag(tag, create_recipes(self.user, 2))
 
         res = self.client.get(TAGS_URL, {'assigned_only': 1})
         self.assertEqual(len(res.data), 1)  # type: ignore
@@ -1,4 +1,5 @@
 """Views for the recipe API."""
+from django.db.models import Exists, OuterRef
 from drf_spectacular.utils import (
     extend_schema_view,
     extend_schema,
@@ -32,8 +33,22 @@ from recipe import serializers
                 OpenApiTypes.STR,
                 description='Comma separated list of ingredient IDs to filter',
             ),
+            OpenApiParameter(
+                'fields',
+                OpenApiTypes.STR,
+                description='Comma separated list of fields to return',
+            ),
         ]
-    )
+    ),
+    retrieve=extend_schema(
+        parameters=[
+            OpenApiParameter(
+                'fields',
+                OpenApiTypes.STR,
+                description='Comma separated list of fields to return',
+            ),
+        ]
+    ),
 )
 class RecipeViewSet(viewsets.ModelViewSet):
     """View for manage recipe APIs."""
@@ -41,6 +56,10 @@ class RecipeViewSet(viewsets.ModelViewSet):
     queryset = Recipe.objects.all()
     authentication_classes = (TokenAuthentication,)
     permission_classes = (IsAuthenticated,)
+    _action_serializers = {
+        'list': serializers.RecipeSerializer,
+        'upload_image': serializers.RecipeImageSerializer,
+    }
 
     def _params_to_ints(self, qs):
         """Convert a list of string IDs to a list of integers."""
@@ -53,24 +72,39 @@ class RecipeViewSet(viewsets.ModelViewSet):
             'ingredients'
             )
         queryset = self.queryset
+        # EXISTS keeps one row per recipe, so no DISTINCT pass is needed
+        # over the recipe columns and nested arrays.
         if tags:
             tag_ids = self._params_to_ints(tags)
-            queryset = queryset.filter(tags__id__in=tag_ids)
+            queryset = queryset.filter(Exists(
+                Recipe.tags.through.objects.filter(
+                    recipe=OuterRef('pk'), tag_id__in=tag_ids)
+            ))
         if ingredients:
             ingredient_ids = self._params_to_ints(ingredients)
-            queryset = queryset.filter(ingredients__id__in=ingredient_ids)
-        return queryset.filter(
+            queryset = queryset.filter(Exists(
+                Recipe.ingredients.through.objects.filter(
+                    recipe=OuterRef('pk'), ingredient_id__in=ingredient_ids)
+            ))
+        queryset = queryset.filter(
             user=self.request.user
-            ).order_by('-id').distinct()
+            ).order_by('-id')
+        if self.action in ('list', 'retrieve'):
+            # Only reads render the nested objects, and must not lazily
+            # load any relation that nested_fields missed.
+            requested = serializers.get_requested_fields(self.request)
+            nested_fields = [
+                name for name in getattr(
+                    self.get_serializer_class().Meta, 'nested_fields', ())
+                if requested is None or name in requested
+            ]
+            queryset = queryset.with_nested(*nested_fields).seal()
+        return queryset
 
     def get_serializer_class(self):  # type: ignore
         """Return appropriate serializer class."""
-        if self.action == 'list':
-            return serializers.RecipeSerializer
-        elif self.action == 'upload_image':
-            return serializers.RecipeImageSerializer
-
-        return self.serializer_class
+        return self._action_serializers.get(
+            self.action, self.serializer_class)
 
     def perform_create(self, serializer):  # type: ignore
         """Create a new recipe."""
@@ -110,6 +144,8 @@ class BaseRecipeAttrViewSet(mixins.ListModelMixin,
     """Base viewset for user owned recipe attributes."""
     authentication_classes = (TokenAuthentication,)
     permission_classes = (IsAuthenticated,)
+    # Name of the Recipe many-to-many field referencing these objects.
+    recipe_field = None
 
     def get_queryset(self):  # type: ignore
         """Return objects for the current authenticated user only."""
@@ -118,20 +154,26 @@ class BaseRecipeAttrViewSet(mixins.ListModelMixin,
                 'assigned_only', 0)
                 )
         )
-        quereyset = self.queryset
+        queryset = self.queryset
         if assigned_only:
-            quereyset = quereyset.filter(recipe__isnull=False)  # type: ignore
-        return quereyset.filter(  # type: ignore
-            user=self.request.user).order_by('-name').distinct()
+            # EXISTS avoids joining recipes and de-duplicating the result.
+            queryset = queryset.filter(Exists(  # type: ignore
+                Recipe.objects.filter(**{self.recipe_field: OuterRef('pk')})
+            ))
+        # The serializers only read id and name; user is just filtered on.
+        return queryset.filter(  # type: ignore
+            user=self.request.user).only('id', 'name').order_by('-name')
 
 
 class TagViewSet(BaseRecipeAttrViewSet):
     """View for manage tag APIs."""
     serializer_class = serializers.TagSerializer
     queryset = Tag.objects.all()
+    recipe_field = 'tags'
 
 
 class IngredientViewSet(BaseRecipeAttrViewSet):
     """View for manage ingredient APIs."""
     serializer_class = serializers.IngredientSerializer
     queryset = Ingredient.objects.all()
+    recipe_field = 'ingredients'